@@ -1,5 +1,6 @@
-from fastapi import FastAPI
+from fastapi import BackgroundTasks, FastAPI, Query
 from pydantic import BaseModel
+from typing import Literal
 import pandas as pd
 import os
 import sys
@@ -7,6 +8,8 @@ import sys
 from predict import PipelinePredictor
 from database import MongoDBConnector
 from logger import Logger
+from monitoring import DriftMonitor
+from profiler import Profiler
 
 class CarFeatures(BaseModel):
     Doors: int
@@ -26,7 +29,48 @@ class CarPriceAPI:
         self.app = FastAPI()
         self.predictor = PipelinePredictor()
         self.db = MongoDBConnector().get_database()
+        self.monitor = DriftMonitor.from_config()
+
+        # Профилирование запросов: PROFILE_REQUESTS=N включает его на старте,
+        # PROFILING_ADMIN=1 открывает маршруты /admin/profile
+        self.profiler = Profiler()
+        if int(os.environ.get("PROFILE_REQUESTS", 0)) > 0:
+            self.profiler.arm(int(os.environ["PROFILE_REQUESTS"]))
+
         self._register_routes()
+        if os.environ.get("PROFILING_ADMIN") == "1":
+            self._register_admin_routes()
+
+    def _predict(self, features: CarFeatures, mode: str) -> dict:
+        """Предсказание и сохранение результата в MongoDB"""
+        # Получаем данные и делаем предсказание
+        input_data = pd.DataFrame([features.model_dump()])
+        if mode == "fast":
+            # Быстрый режим: ранняя остановка по деревьям леса
+            predictions, std_errors, n_trees = self.predictor.predict_fast(input_data)
+            response = {
+                "prediction": float(predictions[0]),
+                "std_error": float(std_errors[0]),
+                "n_trees": int(n_trees[0])
+            }
+        else:
+            response = {"prediction": float(self.predictor.predict(input_data)[0])}
+        
+        # Подготовка данных для сохранения в MongoDB
+        result_data = {
+            "input": features.model_dump(),
+            **response,
+            "mode": mode
+        }
+        
+        # Сохраняем результат в коллекцию 'predictions'
+        try:
+            result = self.db.predictions.insert_one(result_data)
+            self.logger.info(f"Prediction saved with id: {result.inserted_id}")
+        except Exception as e: # pragma: no cover
+            self.logger.error("Error saving prediction", exc_info=True)
+
+        return response
 
     def _register_routes(self):
         """Регистрация маршрутов API"""
@@ -35,25 +79,36 @@ class CarPriceAPI:
             return {'health_check': 'OK'}
 
         @self.app.post("/predict")
-        def predict(features: CarFeatures):
-            # Получаем данные и делаем предсказание
-            input_data = pd.DataFrame([features.model_dump()])
-            prediction = self.predictor.predict(input_data)[0]
-            
-            # Подготовка данных для сохранения в MongoDB
-            result_data = {
-                "input": features.model_dump(),
-                "prediction": prediction
-            }
-            
-            # Сохраняем результат в коллекцию 'predictions'
-            try:
-                result = self.db.predictions.insert_one(result_data)
-                self.logger.info(f"Prediction saved with id: {result.inserted_id}")
-            except Exception as e: # pragma: no cover
-                self.logger.error("Error saving prediction", exc_info=True)
-                
-            return {"prediction": prediction}
+        def predict(features: CarFeatures, background_tasks: BackgroundTasks,
+                    mode: Literal["full", "fast"] = "full"):
+            # Профилировщик проверяется одним флагом, пока он выключен
+            if self.profiler.active:
+                response = self.profiler.run(self._predict, features, mode)
+            else:
+                response = self._predict(features, mode)
+
+            # Обновляем статистику дрейфа уже после отправки ответа
+            if self.monitor is not None:
+                background_tasks.add_task(self.monitor.update, features.model_dump())
+
+            return response
+
+        @self.app.get("/monitoring")
+        def monitoring():
+            if self.monitor is None:
+                return {"status": "disabled"}
+            return {"status": "ok", **self.monitor.report()}
+
+    def _register_admin_routes(self):
+        """Регистрация административных маршрутов профилирования"""
+        @self.app.post("/admin/profile")
+        def start_profile(requests: int = Query(20, ge=1, le=10000)):
+            self.profiler.arm(requests)
+            return self.profiler.status()
+
+        @self.app.get("/admin/profile")
+        def profile_status():
+            return self.profiler.status()
 
     def get_app(self):
         """Возвращает экземпляр FastAPI приложения"""
@@ -0,0 +1,95 @@
+import argparse
+import configparser
+from datetime import datetime
+import numpy as np
+import os
+import pandas as pd
+from logger import Logger
+from predict import PipelinePredictor
+from tracker import ExperimentTracker
+from sklearn.metrics import r2_score
+import sys
+import time
+import traceback
+import yaml
+
+TOLERANCES = [0.005, 0.01, 0.02, 0.05] # Относительные допуски быстрого режима
+N_REQUESTS = 200 # Число одиночных запросов для замера задержки
+
+class FastModeBenchmark():
+    def __init__(self) -> None:
+        # Создаем объекты логера и конфигуратора
+        logger = Logger(True)
+        self.config = configparser.ConfigParser()
+        self.log = logger.get_logger(__name__)
+        self.config.read("config.ini")
+
+        self.predictor = PipelinePredictor()
+
+        # Загружаем тестовые данные
+        try:
+            self.X_test = pd.read_csv(self.config["SPLIT_DATA"]["X_test"], index_col=0)
+            self.y_test = pd.read_csv(self.config["SPLIT_DATA"]["y_test"], index_col=0).values.ravel()
+        except FileNotFoundError: # pragma: no cover
+            self.log.error(traceback.format_exc())
+            sys.exit(1)
+
+    def measure_latency(self, predict_fn, n_requests: int) -> float:
+        """Средняя задержка одиночного запроса в миллисекундах"""
+        rows = [self.X_test.iloc[[i]] for i in range(min(n_requests, len(self.X_test)))]
+        start = time.perf_counter()
+        for row in rows:
+            predict_fn(row)
+        return (time.perf_counter() - start) / len(rows) * 1000
+
+    def run(self, tolerances: list = TOLERANCES, n_requests: int = N_REQUESTS) -> dict:
+        """Сравнение полного и быстрого режимов по задержке и R2"""
+        results = {}
+
+        y_pred = self.predictor.predict(self.X_test)
+        results["full"] = {
+            "R2_score": float(r2_score(self.y_test, y_pred)),
+            "latency_ms": self.measure_latency(self.predictor.predict, n_requests),
+            "mean_trees": float(len(self.predictor.pipeline.named_steps["model"].estimators_))
+        }
+
+        for tol in tolerances:
+            y_pred, _, n_trees = self.predictor.predict_fast(self.X_test, tolerance=tol)
+            results[f"fast_tol_{tol}"] = {
+                "R2_score": float(r2_score(self.y_test, y_pred)),
+                "latency_ms": self.measure_latency(
+                    lambda row: self.predictor.predict_fast(row, tolerance=tol), n_requests),
+                "mean_trees": float(np.mean(n_trees))
+            }
+
+        for name, res in results.items():
+            self.log.info(f"{name}: R2 {res['R2_score']:.4f}, "
+                          f"задержка {res['latency_ms']:.2f} мс, деревьев {res['mean_trees']:.1f}")
+
+        return results
+
+    def save(self, results: dict) -> str:
+        """Сохранение результатов бенчмарка в experiments"""
+        exp_dir = os.path.join(os.getcwd(), "experiments", f"benchmark_{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}")
+        os.makedirs(exp_dir, exist_ok=True)
+
+        with open(os.path.join(exp_dir, "metrics.yaml"), 'w') as metrics_f:
+            yaml.safe_dump(results, metrics_f, sort_keys=False)
+
+        # Обновляем индекс экспериментов
+        ExperimentTracker().log_dir(exp_dir)
+
+        self.log.info(f"Результаты бенчмарка сохранены в {exp_dir}")
+        return exp_dir
+
+
+if __name__ == "__main__": # pragma: no cover
+    parser = argparse.ArgumentParser(description="Fast mode benchmark")
+    parser.add_argument("--requests", "-n",
+                        type=int,
+                        help="Число одиночных запросов для замера задержки",
+                        default=N_REQUESTS)
+    args = parser.parse_args()
+
+    benchmark = FastModeBenchmark()
+    benchmark.save(benchmark.run(n_requests=args.requests))
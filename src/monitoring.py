@@ -0,0 +1,167 @@
+from bisect import bisect_right
+import configparser
+import json
+import numpy as np
+import os
+import pandas as pd
+from logger import Logger
+import random
+from scipy.stats import ks_2samp
+import threading
+import zlib
+
+NUMERIC_FEATURES = ["Mileage", "Engine_Size", "Year"] # Признаки с гистограммой и резервуаром
+CATEGORICAL_FEATURES = ["Brand", "Model"] # Признаки с count-min sketch
+PROFILE_PATH = os.path.join("experiments", "reference_profile.json")
+EPS = 1e-4 # Сглаживание пустых корзин в PSI
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population Stability Index между двумя распределениями по корзинам"""
+    expected = np.clip(np.asarray(expected, dtype=float), EPS, None)
+    actual = np.clip(np.asarray(actual, dtype=float), EPS, None)
+    expected, actual = expected / expected.sum(), actual / actual.sum()
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class CountMinSketch():
+    """Count-min sketch для частот категорий в фиксированной памяти"""
+    def __init__(self, width: int = 2048, depth: int = 4) -> None:
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+
+    def _cells(self, key: str) -> list:
+        data = str(key).encode()
+        return [zlib.crc32(data, row) % self.width for row in range(self.depth)]
+
+    def add(self, key: str, count: int = 1) -> None:
+        for row, col in enumerate(self._cells(key)):
+            self.table[row, col] += count
+
+    def estimate(self, key: str) -> int:
+        return int(min(self.table[row, col] for row, col in enumerate(self._cells(key))))
+
+
+class Reservoir():
+    """Равномерная выборка фиксированного размера из потока (алгоритм R)"""
+    def __init__(self, size: int = 1000, seed: int = 42) -> None:
+        self.size = size
+        self.seen = 0
+        self.values = []
+        self._rng = random.Random(seed)
+
+    def add(self, value: float) -> None:
+        self.seen += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            idx = self._rng.randrange(self.seen)
+            if idx < self.size:
+                self.values[idx] = value
+
+
+def build_reference_profile(X: pd.DataFrame, bins: int = 10, sample_size: int = 1000) -> dict:
+    """Эталонный профиль признаков по обучающей выборке"""
+    profile = {"n_observations": len(X), "numeric": {}, "categorical": {}}
+
+    for col in NUMERIC_FEATURES:
+        values = X[col].astype(float).to_numpy()
+        # Внутренние границы корзин по квантилям; крайние корзины открыты
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+        counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+        sample = np.random.default_rng(42).choice(values, size=min(sample_size, len(values)), replace=False)
+        profile["numeric"][col] = {
+            "edges": edges.tolist(),
+            "proportions": (counts / counts.sum()).tolist(),
+            "sample": sample.tolist()
+        }
+
+    for col in CATEGORICAL_FEATURES:
+        freq = X[col].astype(str).value_counts(normalize=True)
+        profile["categorical"][col] = {"proportions": freq.to_dict()}
+
+    return profile
+
+
+class DriftMonitor():
+    """Потоковая статистика входов /predict и сравнение с эталонным профилем"""
+    def __init__(self, profile: dict, reservoir_size: int = 1000,
+                 cms_width: int = 2048, cms_depth: int = 4) -> None:
+        self.profile = profile
+        self.n_observations = 0
+        self._lock = threading.Lock()
+
+        self.edges = {col: ref["edges"] for col, ref in profile["numeric"].items()}
+        self.histograms = {col: np.zeros(len(edges) + 1, dtype=np.int64) for col, edges in self.edges.items()}
+        self.reservoirs = {col: Reservoir(reservoir_size) for col in profile["numeric"]}
+        self.sketches = {col: CountMinSketch(cms_width, cms_depth) for col in profile["categorical"]}
+
+    @classmethod
+    def from_config(cls, config_path: str = "config.ini"):
+        """Создание монитора по config.ini; None, если профиль не найден"""
+        log = Logger(True).get_logger(__name__)
+        config = configparser.ConfigParser()
+        config.read(config_path)
+
+        profile_path = config.get("MONITORING", "profile", fallback=PROFILE_PATH)
+        try:
+            with open(profile_path) as f:
+                profile = json.load(f)
+        except FileNotFoundError:
+            log.warning(f"Эталонный профиль {profile_path} не найден, мониторинг дрейфа отключён")
+            return None
+
+        log.info(f"Эталонный профиль загружен из {profile_path}")
+        return cls(
+            profile,
+            reservoir_size=config.getint("MONITORING", "reservoir_size", fallback=1000),
+            cms_width=config.getint("MONITORING", "cms_width", fallback=2048),
+            cms_depth=config.getint("MONITORING", "cms_depth", fallback=4)
+        )
+
+    def update(self, features: dict) -> None:
+        """Учёт одного входа: O(число признаков), память не растёт"""
+        with self._lock:
+            self.n_observations += 1
+            for col, edges in self.edges.items():
+                value = float(features[col])
+                self.histograms[col][bisect_right(edges, value)] += 1
+                self.reservoirs[col].add(value)
+            for col, sketch in self.sketches.items():
+                sketch.add(str(features[col]))
+
+    def report(self) -> dict:
+        """PSI и KS по каждому признаку относительно эталона"""
+        with self._lock:
+            n = self.n_observations
+            histograms = {col: hist.copy() for col, hist in self.histograms.items()}
+            samples = {col: list(res.values) for col, res in self.reservoirs.items()}
+            estimates = {
+                col: {cat: sketch.estimate(cat) for cat in self.profile["categorical"][col]["proportions"]}
+                for col, sketch in self.sketches.items()
+            }
+
+        report = {"n_observations": n, "features": {}}
+        if n == 0:
+            return report
+
+        for col, ref in self.profile["numeric"].items():
+            ks = ks_2samp(ref["sample"], samples[col])
+            report["features"][col] = {
+                "psi": psi(ref["proportions"], histograms[col]),
+                "ks": float(ks.statistic),
+                "ks_pvalue": float(ks.pvalue)
+            }
+
+        for col, ref in self.profile["categorical"].items():
+            categories = list(ref["proportions"])
+            counts = [estimates[col][cat] for cat in categories]
+            # Оценки count-min завышены, поэтому остаток для новых категорий не меньше нуля
+            counts.append(max(n - sum(counts), 0))
+            expected = [ref["proportions"][cat] for cat in categories] + [0.0]
+            report["features"][col] = {
+                "psi": psi(expected, counts),
+                "unseen_share": counts[-1] / n
+            }
+
+        return report
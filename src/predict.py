@@ -1,4 +1,5 @@
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 import configparser
 from datetime import datetime
 import numpy as np
@@ -6,20 +7,28 @@ import os
 import json
 import pandas as pd
 from logger import Logger
+from tracker import ExperimentTracker, file_digest
+from profiler import Profiler
 from sklearn.metrics import r2_score
+from sklearn.utils import check_array
+from scipy.sparse import issparse
 from pickle import load
 import shutil
 import sys
+import time
 import traceback
 import yaml
 
+MAX_WORKERS = 8 # Число потоков для параллельной загрузки тестовых JSON
+
 class PipelinePredictor():
-    def __init__(self) -> None:
+    def __init__(self, index_path: str = None) -> None:
         # Создаем объекты логера и конфигуратора
         logger = Logger(True)
         self.config = configparser.ConfigParser()
         self.log = logger.get_logger(__name__)
         self.config.read("config.ini")
+        self.index_path = index_path # None -> индекс из config.ini
         
         # Путь к пайплайну
         self.pipeline_path = self.config["RAND_FOREST"]["path"]
@@ -33,10 +42,88 @@ class PipelinePredictor():
             self.log.error("Файл с пайплайном не найден")
             sys.exit(1)
 
+        # Параметры быстрого режима (ранняя остановка по деревьям)
+        self.fast_tolerance = self.config.getfloat("FAST_MODE", "tolerance", fallback=0.01)
+        self.fast_min_trees = self.config.getint("FAST_MODE", "min_trees", fallback=10)
+        self.fast_max_trees = self.config.getint("FAST_MODE", "max_trees", fallback=50)
+
     def predict(self, X_input: pd.DataFrame) -> float:
         """Предсказание через API"""
         return self.pipeline.predict(X_input)
+
+    def predict_fast(self, X_input: pd.DataFrame,
+                     tolerance: float = None,
+                     max_trees: int = None) -> tuple:
+        """Приближённое предсказание с ранней остановкой по деревьям леса.
+
+        Деревья вычисляются по одному, для каждой строки ведётся бегущее
+        среднее и его стандартная ошибка. Строка считается готовой, когда
+        стандартная ошибка не превышает tolerance * |среднее| (после min_trees
+        деревьев) или исчерпан бюджет max_trees.
+
+        Returns:
+            tuple: (предсказания, стандартные ошибки, число использованных деревьев)
+        """
+        tolerance = self.fast_tolerance if tolerance is None else tolerance
+        max_trees = self.fast_max_trees if max_trees is None else max_trees
+
+        # Препроцессинг и валидация выполняются один раз, а не в каждом дереве:
+        # плотный float32 позволяет обходить деревья напрямую через tree_
+        X = self.pipeline[:-1].transform(X_input)
+        if issparse(X):
+            X = X.toarray()
+        X = check_array(X, dtype=np.float32)
+        trees = self.pipeline.named_steps["model"].estimators_[:max(max_trees, 1)]
+
+        n_rows = X.shape[0]
+        mean = np.zeros(n_rows)
+        m2 = np.zeros(n_rows)
+        n_trees = np.zeros(n_rows, dtype=int)
+        active = np.arange(n_rows)
+
+        for k, tree in enumerate(trees, start=1):
+            # Алгоритм Уэлфорда для бегущего среднего и дисперсии
+            y = tree.tree_.predict(X[active]).reshape(active.size, -1)[:, 0]
+            delta = y - mean[active]
+            mean[active] += delta / k
+            m2[active] += delta * (y - mean[active])
+            n_trees[active] = k
+
+            # Стандартная ошибка определена только начиная со второго дерева
+            if k >= max(self.fast_min_trees, 2):
+                std_error = np.sqrt(m2[active] / (k - 1) / k)
+                converged = std_error <= tolerance * np.abs(mean[active])
+                active = active[~converged]
+                if active.size == 0:
+                    break
+
+        std_error = np.zeros(n_rows)
+        mask = n_trees > 1
+        std_error[mask] = np.sqrt(m2[mask] / (n_trees[mask] - 1) / n_trees[mask])
+
+        return mean, std_error, n_trees
     
+    def _load_test_case(self, test_file: str) -> dict:
+        """Чтение одного тестового JSON"""
+        with open(test_file) as f:
+            return json.load(f)
+
+    def load_test_cases(self, tests_path: str, max_workers: int = MAX_WORKERS) -> tuple:
+        """Параллельная загрузка тестовых JSON в один батч
+
+        Returns:
+            tuple: (признаки DataFrame, целевые значения, имена файлов)
+        """
+        test_files = sorted(f for f in os.listdir(tests_path) if f.endswith(".json"))
+        paths = [os.path.join(tests_path, test) for test in test_files]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            cases = list(executor.map(self._load_test_case, paths))
+
+        X = pd.DataFrame([case["X"] for case in cases])
+        y = np.array([case["y"]["prediction"] for case in cases])
+        return X, y, test_files
+
     def test(self) -> bool:
         """Тестирование модели без API"""
         # Создаем парсер для аргументов
@@ -49,12 +136,24 @@ class PipelinePredictor():
                                  help="Тип тестирования (smoke или func)",
                                  default="smoke",
                                  choices=["smoke", "func"])
+        parser.add_argument("--profile",
+                                 action="store_true",
+                                 help="Сохранить CPU-профиль и профиль аллокаций в experiments")
         
         # Передаем аргументы
         args = parser.parse_args()  # В обычном запуске читаем аргументы
-            
+
+        if args.profile:
+            Profiler().profile_call(f"predict_{args.test}", self._run_test, args.test)
+        else:
+            self._run_test(args.test)
+
+        return True
+
+    def _run_test(self, test_type: str) -> None:
+        """Запуск smoke или функционального теста"""
         # Smoke test    
-        if args.test == "smoke":
+        if test_type == "smoke":
             try:
                 X = pd.read_csv(self.config["SPLIT_DATA"]["X_test"], index_col=0)
                 y = pd.read_csv(self.config["SPLIT_DATA"]["y_test"], index_col=0).values.ravel()
@@ -67,57 +166,59 @@ class PipelinePredictor():
                 sys.exit(1)
         
         # Functional test
-        elif args.test == "func":
+        elif test_type == "func":
             try:
                 # Получаем путь к тестовым json
                 base_dir= os.path.dirname(os.path.dirname(__file__))  
                 tests_path = os.path.join(base_dir, "tests", "test_data")
                 
-                # Собираем все примеры
-                all_X, all_y = [], []
-                test_files = os.listdir(tests_path)
-
-                for test in test_files:
-                    test_file = os.path.join(tests_path, test)
-                    with open(test_file) as f:
-                        test_data = json.load(f)
-
-                    X = [test_data["X"]]
-                    y = [test_data["y"]["prediction"]]
-
-                    all_X.extend(X)
-                    all_y.extend(y)
-
-                all_X_df = pd.DataFrame(all_X)
-                all_y = np.array(all_y)
+                # Собираем все примеры одним батчем
+                timings = {}
+                start = time.perf_counter()
+                all_X_df, all_y, test_files = self.load_test_cases(tests_path)
+                timings["load_s"] = time.perf_counter() - start
 
                 # Делаем предсказание и оцениваем метрику
+                start = time.perf_counter()
                 y_pred = self.pipeline.predict(all_X_df)
                 r2 = r2_score(all_y, y_pred)
+                timings["predict_s"] = time.perf_counter() - start
                 self.log.info(f"Func tests пройдены. Итоговый R2: {r2:.4f}")
 
                 # Параметры эксперимента
                 exp_dir = os.path.join(os.getcwd(), "experiments", f"experiment_{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}")
                 os.makedirs(exp_dir, exist_ok=True)
 
+                model_hash, model_size = file_digest(self.pipeline_path)
                 config_data = {
                     "model_params": self.pipeline.named_steps["model"].get_params(),
                     "model_path": self.pipeline_path,
+                    "model_hash": model_hash,
+                    "model_size": model_size,
                     "test_data_paths": test_files
                 }
 
-                metrics_data = {
-                    "R2_score": r2
-                }
-
                 # Сохраняем данные эксперимента
+                start = time.perf_counter()
                 with open(os.path.join(exp_dir, "config.yaml"), 'w') as cfg_f:
                     yaml.safe_dump(config_data, cfg_f, sort_keys=False)
 
+                # Копия, а не жёсткая ссылка: Logger открывает logfile.log в режиме 'w'
+                # и следующий запуск обнулил бы logs.txt этого эксперимента
+                shutil.copy("logfile.log", os.path.join(exp_dir, 'logs.txt'))
+                timings["save_s"] = time.perf_counter() - start
+
+                metrics_data = {
+                    "R2_score": float(r2),
+                    "n_test_cases": len(test_files),
+                    "timings": timings
+                }
+
                 with open(os.path.join(exp_dir, "metrics.yaml"), 'w') as metrics_f:
                     yaml.safe_dump(metrics_data, metrics_f, sort_keys=False)
 
-                shutil.copy("logfile.log", os.path.join(exp_dir, 'logs.txt'))
+                # Обновляем индекс экспериментов
+                ExperimentTracker(self.index_path).log_dir(exp_dir)
 
                 self.log.info(f"Функциональные тесты завершены успешно")
 
@@ -126,8 +227,6 @@ class PipelinePredictor():
                 self.log.error(traceback.format_exc())
                 sys.exit(1)
 
-        return True
-
 
 if __name__ == "__main__": # pragma: no cover
     predictor = PipelinePredictor()
@@ -0,0 +1,165 @@
+import cProfile
+from datetime import datetime
+import io
+import os
+from logger import Logger
+import pstats
+import threading
+import time
+import tracemalloc
+from tracker import ExperimentTracker
+import yaml
+
+TOP_N = 40 # Число строк в текстовых отчётах профиля
+
+# Собственные аллокации профилировщика не относятся к профилируемому коду
+ALLOCATION_FILTERS = [
+    tracemalloc.Filter(False, cProfile.__file__),
+    tracemalloc.Filter(False, pstats.__file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<unknown>")
+]
+
+def _snapshot() -> tracemalloc.Snapshot:
+    """Снимок tracemalloc без аллокаций профилировщика"""
+    return tracemalloc.take_snapshot().filter_traces(ALLOCATION_FILTERS)
+
+class Profiler():
+    """Сбор CPU-профиля (cProfile) и профиля аллокаций (tracemalloc)"""
+    def __init__(self, output_dir: str = "experiments", top: int = TOP_N, index_path: str = None) -> None:
+        self.log = Logger(True).get_logger(__name__)
+        self.output_dir = output_dir
+        self.top = top
+        self.index_path = index_path # None -> индекс из config.ini
+
+        # Состояние профилирования запросов сервиса
+        self.active = False
+        self.target = None
+        self.n_requests = 0
+        self.last_dir = None
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+
+    def _start_tracing(self) -> bool:
+        """Запуск tracemalloc; True, если его запустили мы"""
+        if tracemalloc.is_tracing():
+            return False
+        tracemalloc.start()
+        return True
+
+    def profile_call(self, target: str, func, *args, **kwargs):
+        """Профилирование одного вызова (обучение, пакетный скоринг) с сохранением в experiments"""
+        started = self._start_tracing()
+        baseline = _snapshot()
+        tracemalloc.reset_peak()
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            result = profile.runcall(func, *args, **kwargs)
+        finally:
+            wall = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            allocations = _snapshot().compare_to(baseline, "lineno")
+            if started:
+                tracemalloc.stop()
+            self._save(target, pstats.Stats(profile), allocations,
+                       {"n_samples": 1, "wall_s": wall, "peak_memory_mb": peak / 2**20})
+        return result
+
+    def arm(self, n_requests: int) -> None:
+        """Включение профилирования следующих n_requests запросов"""
+        with self._lock:
+            self._stats = None
+            self._walls = []
+            self._peaks = []
+            # При повторном включении окно уже открыто и tracemalloc запущен нами:
+            # флаг сохраняется, иначе трассировка не остановится по окончании окна
+            if not self.active:
+                self._started_tracing = self._start_tracing()
+            # Аллокации окна считаются относительно памяти на момент включения
+            self._baseline = _snapshot()
+            self.target = n_requests
+            self.n_requests = 0
+            self.active = True
+        self.log.info(f"Профилирование включено на {n_requests} запросов")
+
+    def run(self, func, *args, **kwargs):
+        """Выполнение запроса под профилировщиком, пока окно профилирования открыто"""
+        # cProfile не допускает параллельных сессий: занятый профилировщик пропускаем
+        if not self._busy.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            tracemalloc.reset_peak()
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            try:
+                return profile.runcall(func, *args, **kwargs)
+            finally:
+                self._collect(profile, time.perf_counter() - start, tracemalloc.get_traced_memory()[1])
+        finally:
+            self._busy.release()
+
+    def _collect(self, profile: cProfile.Profile, wall: float, peak: int) -> None:
+        """Агрегация профиля запроса; по достижении цели профиль сохраняется"""
+        with self._lock:
+            if not self.active:
+                return
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            self._walls.append(wall)
+            self._peaks.append(peak)
+            self.n_requests += 1
+            if self.n_requests < self.target:
+                return
+
+            self.active = False
+            allocations = _snapshot().compare_to(self._baseline, "lineno")
+            if self._started_tracing:
+                tracemalloc.stop()
+            metrics = {
+                "n_samples": self.n_requests,
+                "wall_s": sum(self._walls),
+                "mean_latency_ms": sum(self._walls) / len(self._walls) * 1000,
+                "max_latency_ms": max(self._walls) * 1000,
+                "peak_memory_mb": max(self._peaks) / 2**20
+            }
+            self.last_dir = self._save("api", self._stats, allocations, metrics)
+
+    def status(self) -> dict:
+        """Текущее состояние профилирования запросов"""
+        return {
+            "active": self.active,
+            "collected": self.n_requests,
+            "target": self.target,
+            "last_profile": self.last_dir
+        }
+
+    def _save(self, target: str, stats: pstats.Stats, allocations: list, metrics: dict) -> str:
+        """Сохранение профиля в experiments/profile_<timestamp>"""
+        # Микросекунды в имени: профили, завершённые в одну секунду, не перезаписывают друг друга
+        exp_dir = os.path.join(self.output_dir, f"profile_{datetime.now().strftime('%Y_%m_%d_%H_%M_%S_%f')}")
+        os.makedirs(exp_dir)
+
+        # Бинарный профиль открывается в pstats/snakeviz, текстовый читается сразу
+        stats.dump_stats(os.path.join(exp_dir, "profile.prof"))
+        stream = io.StringIO()
+        pstats.Stats(os.path.join(exp_dir, "profile.prof"), stream=stream).sort_stats("cumulative").print_stats(self.top)
+        with open(os.path.join(exp_dir, "profile.txt"), 'w') as f:
+            f.write(stream.getvalue())
+
+        # Прирост памяти за время профилирования по строкам кода
+        with open(os.path.join(exp_dir, "allocations.txt"), 'w') as f:
+            for stat in [stat for stat in allocations if stat.size_diff > 0][:self.top]:
+                f.write(f"{stat}\n")
+
+        with open(os.path.join(exp_dir, "config.yaml"), 'w') as cfg_f:
+            yaml.safe_dump({"target": target}, cfg_f, sort_keys=False)
+        with open(os.path.join(exp_dir, "metrics.yaml"), 'w') as metrics_f:
+            yaml.safe_dump(metrics, metrics_f, sort_keys=False)
+
+        ExperimentTracker(self.index_path).log_dir(exp_dir)
+        self.log.info(f"Профиль {target} сохранён в {exp_dir}")
+        return exp_dir
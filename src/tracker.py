@@ -0,0 +1,350 @@
+import argparse
+import configparser
+from contextlib import contextmanager
+from datetime import datetime
+import glob
+import hashlib
+import os
+import pandas as pd
+from logger import Logger
+import re
+import sqlite3
+import yaml
+
+INDEX_PATH = os.path.join("experiments", "index.db") # Путь к индексу по умолчанию
+DIR_PATTERNS = ["experiment_*", "benchmark_*", "profile_*", "api_*"] # Каталоги экспериментов для перестроения
+FILTER_RE = re.compile(r"^([\w.]+)\s*(>=|<=|!=|=|>|<)\s*(.+)$")
+RUN_COLUMNS = ["run_id", "kind", "created_at", "source_dir", "model_path", "model_hash", "model_size"] # Колонки таблицы runs
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    source_dir TEXT,
+    model_path TEXT,
+    model_hash TEXT,
+    model_size INTEGER
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value TEXT,
+    value_num REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_kind ON runs(kind, created_at);
+CREATE INDEX IF NOT EXISTS idx_params_name ON params(name, value);
+CREATE INDEX IF NOT EXISTS idx_metrics_name ON metrics(name, value);
+"""
+NUM_INDEX = "CREATE INDEX IF NOT EXISTS idx_params_num ON params(name, value_num)"
+
+def flatten(data: dict, prefix: str = "") -> dict:
+    """Разворачивает вложенный словарь в ключи вида a.b.c"""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
+
+def to_number(value):
+    """Числовое значение параметра или None для текстовых ('sqrt', 'poisson', True)"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+def file_digest(path: str) -> tuple:
+    """SHA-256 и размер файла артефакта (None, None, если файла нет)"""
+    if not path or not os.path.isfile(path):
+        return None, None
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest(), os.path.getsize(path)
+
+
+class ExperimentTracker():
+    def __init__(self, index_path: str = None) -> None:
+        # Создаем объекты логера и конфигуратора
+        logger = Logger(True)
+        self.config = configparser.ConfigParser()
+        self.log = logger.get_logger(__name__)
+        self.config.read("config.ini")
+
+        self.index_path = index_path or self.config.get("TRACKING", "index", fallback=INDEX_PATH)
+        os.makedirs(os.path.dirname(self.index_path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            conn.execute(NUM_INDEX)
+
+    @contextmanager
+    def _connect(self):
+        """Транзакция над индексом; WAL позволяет читать во время записи"""
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Добавление params.value_num в индексы, созданные до его появления"""
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(params)")]
+        if "value_num" in columns:
+            return
+        conn.execute("ALTER TABLE params ADD COLUMN value_num REAL")
+        conn.executemany(
+            "UPDATE params SET value_num = ? WHERE run_id = ? AND name = ?",
+            [(to_number(value), run_id, name)
+             for run_id, name, value in conn.execute("SELECT run_id, name, value FROM params").fetchall()]
+        )
+
+    def _insert(self, conn: sqlite3.Connection, run: dict) -> None:
+        """Запись одного прогона (вызывается внутри транзакции)"""
+        conn.execute("DELETE FROM runs WHERE run_id = ?", (run["run_id"],))
+        conn.execute(
+            "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run["run_id"], run["kind"], run["created_at"], run.get("source_dir"),
+             run.get("model_path"), run.get("model_hash"), run.get("model_size"))
+        )
+        conn.executemany(
+            "INSERT INTO params (run_id, name, value, value_num) VALUES (?, ?, ?, ?)",
+            [(run["run_id"], name, None if value is None else str(value), to_number(value))
+             for name, value in flatten(run.get("params", {})).items()]
+        )
+        metrics = flatten(run.get("metrics", {}))
+        metrics.update(flatten(run.get("timings", {}), "timings."))
+        conn.executemany(
+            "INSERT INTO metrics VALUES (?, ?, ?)",
+            [(run["run_id"], name, float(value)) for name, value in metrics.items()
+             if isinstance(value, (int, float)) and not isinstance(value, bool)]
+        )
+
+    def log_run(self, run_id: str, kind: str, params: dict = None, metrics: dict = None,
+                timings: dict = None, model_path: str = None, source_dir: str = None,
+                created_at: str = None) -> dict:
+        """Атомарная запись прогона в индекс"""
+        model_hash, model_size = file_digest(model_path)
+        run = {
+            "run_id": run_id,
+            "kind": kind,
+            "created_at": created_at or datetime.now().isoformat(timespec="seconds"),
+            "source_dir": source_dir,
+            "model_path": model_path,
+            "model_hash": model_hash,
+            "model_size": model_size,
+            "params": params or {},
+            "metrics": metrics or {},
+            "timings": timings or {}
+        }
+        with self._connect() as conn:
+            self._insert(conn, run)
+        self.log.info(f"Прогон {run_id} записан в индекс {self.index_path}")
+        return run
+
+    def _read_dir(self, exp_dir: str) -> dict:
+        """Восстановление прогона из каталога эксперимента"""
+        name = os.path.basename(os.path.normpath(exp_dir))
+        kind, _, stamp = name.partition("_")
+        # Метка времени с секундами или с микросекундами (каталоги профилей)
+        created_at = None
+        for fmt in ("%Y_%m_%d_%H_%M_%S", "%Y_%m_%d_%H_%M_%S_%f"):
+            try:
+                created_at = datetime.strptime(stamp, fmt).isoformat()
+                break
+            except ValueError:
+                pass
+        if created_at is None:
+            created_at = datetime.fromtimestamp(os.path.getmtime(exp_dir)).isoformat(timespec="seconds")
+
+        config_data, metrics_data = {}, {}
+        if os.path.isfile(os.path.join(exp_dir, "config.yaml")):
+            with open(os.path.join(exp_dir, "config.yaml")) as f:
+                config_data = yaml.safe_load(f) or {}
+        if os.path.isfile(os.path.join(exp_dir, "metrics.yaml")):
+            with open(os.path.join(exp_dir, "metrics.yaml")) as f:
+                metrics_data = yaml.safe_load(f) or {}
+
+        timings = metrics_data.pop("timings", {})
+        return {
+            "run_id": name,
+            "kind": "func" if kind == "experiment" else kind,
+            "created_at": created_at,
+            "source_dir": exp_dir,
+            "model_path": config_data.get("model_path"),
+            "model_hash": config_data.get("model_hash"),
+            "model_size": config_data.get("model_size"),
+            "params": config_data.get("model_params", {}),
+            "metrics": metrics_data,
+            "timings": timings
+        }
+
+    def log_dir(self, exp_dir: str) -> dict:
+        """Атомарная запись прогона из каталога эксперимента"""
+        run = self._read_dir(exp_dir)
+        with self._connect() as conn:
+            self._insert(conn, run)
+        self.log.info(f"Прогон {run['run_id']} записан в индекс {self.index_path}")
+        return run
+
+    def rebuild(self, experiments_dir: str = "experiments") -> int:
+        """Перестроение индекса по существующим каталогам экспериментов"""
+        dirs = sorted(d for pattern in DIR_PATTERNS
+                      for d in glob.glob(os.path.join(experiments_dir, pattern)) if os.path.isdir(d))
+        runs = [self._read_dir(d) for d in dirs]
+
+        # Прогоны обучения не имеют каталога и сохраняются как есть
+        with self._connect() as conn:
+            conn.execute("DELETE FROM runs WHERE source_dir IS NOT NULL")
+            for run in runs:
+                self._insert(conn, run)
+
+        self.log.info(f"Индекс перестроен: {len(runs)} прогонов из {experiments_dir}")
+        return len(runs)
+
+    def list_runs(self, kind: str = None, filters: list = None, sort: str = None,
+                  descending: bool = False, limit: int = None, columns: list = None) -> pd.DataFrame:
+        """Список прогонов с фильтрацией по параметрам/метрикам и сортировкой
+
+        Фильтры задаются строками вида "R2_score>=0.9" или "criterion=poisson".
+        """
+        where, args = [], []
+        if kind:
+            where.append("r.kind = ?")
+            args.append(kind)
+
+        for expr in filters or []:
+            match = FILTER_RE.match(expr.strip())
+            if match is None:
+                raise ValueError(f"Некорректный фильтр: {expr}")
+            name, op, value = match.groups()
+            # Числовые сравнения идут по value_num, где у текстовых параметров NULL
+            number = to_number(value)
+            param_cond = f"value {op} ?" if number is None else f"value_num {op} ?"
+            where.append(
+                f"r.run_id IN (SELECT run_id FROM metrics WHERE name = ? AND value {op} ? "
+                f"UNION SELECT run_id FROM params WHERE name = ? AND {param_cond})"
+            )
+            args += [name, number, name, value if number is None else number]
+
+        query = "SELECT r.run_id, r.kind, r.created_at, r.model_hash, r.model_size FROM runs r"
+        direction = "DESC" if descending else "ASC"
+        by_name = sort and sort not in RUN_COLUMNS
+        if by_name:
+            # Сортировка по метрике, иначе по числовому значению параметра;
+            # нечисловые значения идут после числовых и упорядочиваются как текст
+            query += (" LEFT JOIN metrics s ON s.run_id = r.run_id AND s.name = ?"
+                      " LEFT JOIN params p ON p.run_id = r.run_id AND p.name = ?")
+            args = [sort, sort] + args
+            number = "COALESCE(s.value, p.value_num)"
+            order = f"{number} IS NULL, {number} {direction}, p.value {direction}"
+        else:
+            order = f"r.{sort or 'created_at'} {direction}"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        query += f" ORDER BY {order}, r.run_id"
+        if limit:
+            query += " LIMIT ?"
+            args.append(limit)
+
+        with self._connect() as conn:
+            if by_name and conn.execute(
+                    "SELECT 1 FROM metrics WHERE name = ? UNION SELECT 1 FROM params WHERE name = ? LIMIT 1",
+                    (sort, sort)).fetchone() is None:
+                raise ValueError(f"Неизвестное поле для сортировки: {sort}")
+            runs = pd.read_sql_query(query, conn, params=args)
+            runs["model_size"] = runs["model_size"].astype("Int64")
+            columns = columns if columns is not None else ["R2_score"]
+            if columns and runs.empty:
+                # Пустой результат сохраняет запрошенные колонки метрик
+                runs = runs.assign(**{name: pd.Series(dtype=float) for name in columns})
+            elif columns:
+                placeholders = ",".join("?" * len(runs))
+                values = pd.read_sql_query(
+                    f"SELECT run_id, name, value FROM metrics WHERE run_id IN ({placeholders}) "
+                    f"AND name IN ({','.join('?' * len(columns))})",
+                    conn, params=list(runs["run_id"]) + list(columns)
+                ).pivot(index="run_id", columns="name", values="value")
+                runs = runs.join(values.reindex(columns=columns), on="run_id")
+
+        return runs
+
+    def get_run(self, run_id: str) -> dict:
+        """Параметры и метрики одного прогона"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is None:
+                raise KeyError(f"Прогон {run_id} не найден в индексе")
+            params = dict(conn.execute("SELECT name, value FROM params WHERE run_id = ?", (run_id,)))
+            metrics = dict(conn.execute("SELECT name, value FROM metrics WHERE run_id = ?", (run_id,)))
+
+        return {**dict(zip(RUN_COLUMNS, row)), "params": params, "metrics": metrics}
+
+    def diff(self, run_a: str, run_b: str) -> pd.DataFrame:
+        """Различающиеся поля, параметры и метрики двух прогонов"""
+        runs = []
+        for run_id in (run_a, run_b):
+            run = self.get_run(run_id)
+            flat = {k: v for k, v in run.items() if k not in ("params", "metrics", "run_id")}
+            flat.update({f"params.{k}": v for k, v in run["params"].items()})
+            flat.update({f"metrics.{k}": v for k, v in run["metrics"].items()})
+            runs.append(flat)
+
+        keys = sorted(set(runs[0]) | set(runs[1]))
+        rows = [(key, runs[0].get(key), runs[1].get(key)) for key in keys
+                if runs[0].get(key) != runs[1].get(key)]
+        return pd.DataFrame(rows, columns=["field", run_a, run_b]).set_index("field")
+
+
+if __name__ == "__main__": # pragma: no cover
+    parser = argparse.ArgumentParser(description="Experiment tracker")
+    parser.add_argument("--index", type=str, help="Путь к индексу SQLite", default=None)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="Список прогонов")
+    list_parser.add_argument("--kind", "-k", type=str, help="Тип прогона (train, func, benchmark, profile, api)")
+    list_parser.add_argument("--where", "-w", action="append", default=[],
+                             help="Фильтр вида R2_score>=0.9 (можно указывать несколько раз)")
+    list_parser.add_argument("--sort", "-s", type=str, help="Поле или метрика для сортировки")
+    list_parser.add_argument("--desc", action="store_true", help="Сортировка по убыванию")
+    list_parser.add_argument("--limit", "-n", type=int, help="Максимальное число строк")
+    list_parser.add_argument("--columns", "-c", nargs="*", default=["R2_score"],
+                             help="Метрики для вывода")
+
+    diff_parser = subparsers.add_parser("diff", help="Сравнение двух прогонов")
+    diff_parser.add_argument("run_a", type=str)
+    diff_parser.add_argument("run_b", type=str)
+
+    subparsers.add_parser("rebuild", help="Перестроение индекса по каталогам experiments")
+
+    args = parser.parse_args()
+    tracker = ExperimentTracker(args.index)
+
+    with pd.option_context("display.max_rows", None, "display.max_columns", None, "display.width", 200):
+        if args.command == "list":
+            runs = tracker.list_runs(args.kind, args.where, args.sort, args.desc, args.limit, args.columns)
+            runs["model_hash"] = runs["model_hash"].str[:12]
+            print(runs.to_string(index=False))
+        elif args.command == "diff":
+            print(tracker.diff(args.run_a, args.run_b).to_string())
+        elif args.command == "rebuild":
+            tracker.rebuild()
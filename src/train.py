@@ -1,7 +1,13 @@
+import argparse
 import configparser
+from datetime import datetime
 import os
 import pandas as pd
 from logger import Logger
+from tracker import ExperimentTracker
+from monitoring import build_reference_profile, PROFILE_PATH
+from profiler import Profiler
+import json
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
@@ -9,16 +15,18 @@ from sklearn.preprocessing import OrdinalEncoder, MinMaxScaler, OneHotEncoder
 from sklearn.metrics import r2_score
 import pickle
 import sys
+import time
 import traceback
 
 class ForestPipelineModel():
-    def __init__(self) -> None:
+    def __init__(self, index_path: str = None) -> None:
         # Создаем объекты логера и конфигуратора,
         # и считываем конфигурацию
         logger = Logger(True)
         self.config = configparser.ConfigParser()
         self.log = logger.get_logger(__name__)
         self.config.read("config.ini")
+        self.index_path = index_path # None -> индекс из config.ini
         
         # Загружаем данные
         try:
@@ -38,6 +46,8 @@ class ForestPipelineModel():
 
         # Путь для сохранения пайплайна
         self.pipeline_path = os.path.join("experiments", "rand_forest_pipeline.pkl")
+        # Путь для эталонного профиля признаков (мониторинг дрейфа)
+        self.profile_path = self.config.get("MONITORING", "profile", fallback=PROFILE_PATH)
 
     def create_pipeline(self, use_config: bool) -> Pipeline:
         """Создание пайплайна на основе RandomForestRegressor"""
@@ -79,8 +89,11 @@ class ForestPipelineModel():
 
     def train_and_evaluate(self, pipeline: Pipeline, predict: bool = True):
         """Обучение и тестирование пайплайна"""
+        timings, metrics = {}, {}
         try:
+            start = time.perf_counter()
             pipeline.fit(self.X_train, self.y_train)
+            timings["fit_s"] = time.perf_counter() - start
             self.log.info("Пайплайн обучен успешно")
         except Exception: # pragma: no cover
             self.log.error("Ошибка при обучении пайплайна")
@@ -88,11 +101,27 @@ class ForestPipelineModel():
             sys.exit(1)
 
         if predict:
+            start = time.perf_counter()
             y_pred = pipeline.predict(self.X_test)
+            timings["predict_s"] = time.perf_counter() - start
             r2 = r2_score(self.y_test, y_pred)
+            metrics["R2_score"] = float(r2)
             self.log.info(f"R2 Score: {r2:.4f}")
 
+        start = time.perf_counter()
         self.save_pipeline(pipeline)
+        self.save_reference_profile()
+        timings["save_s"] = time.perf_counter() - start
+
+        # Обновляем индекс экспериментов
+        ExperimentTracker(self.index_path).log_run(
+            run_id=f"train_{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}",
+            kind="train",
+            params=pipeline.named_steps["model"].get_params(),
+            metrics=metrics,
+            timings=timings,
+            model_path=self.pipeline_path
+        )
 
     def save_pipeline(self, pipeline: Pipeline):
         """Сохранение пайплайна"""
@@ -100,8 +129,23 @@ class ForestPipelineModel():
             pickle.dump(pipeline, f)
         self.log.info(f'Пайплайн сохранён в {self.pipeline_path}')
 
+    def save_reference_profile(self):
+        """Сохранение эталонного профиля обучающих данных для мониторинга дрейфа"""
+        profile = build_reference_profile(self.X_train)
+        with open(self.profile_path, 'w') as f:
+            json.dump(profile, f)
+        self.log.info(f'Эталонный профиль сохранён в {self.profile_path}')
+
 
 if __name__ == "__main__": # pragma: no cover
+    parser = argparse.ArgumentParser(description="Trainer")
+    parser.add_argument("--profile", action="store_true",
+                        help="Сохранить CPU-профиль и профиль аллокаций обучения в experiments")
+    args = parser.parse_args()
+
     forest_pipeline = ForestPipelineModel()
     pipeline = forest_pipeline.create_pipeline(use_config=False)
-    forest_pipeline.train_and_evaluate(pipeline, predict=True)
+    if args.profile:
+        Profiler().profile_call("train", forest_pipeline.train_and_evaluate, pipeline, predict=True)
+    else:
+        forest_pipeline.train_and_evaluate(pipeline, predict=True)
@@ -0,0 +1,33 @@
+import pytest
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.insert(1, os.path.join(os.getcwd(), "src"))
+
+from benchmark import FastModeBenchmark
+from tracker import ExperimentTracker
+
+@pytest.fixture
+def benchmark():
+    """Создаёт объект бенчмарка перед каждым тестом"""
+    return FastModeBenchmark()
+
+def test_run(benchmark):
+    """Проверяем, что бенчмарк сравнивает полный и быстрый режимы"""
+    results = benchmark.run(tolerances=[0.05], n_requests=5)
+    assert set(results) == {"full", "fast_tol_0.05"}
+    for res in results.values():
+        assert {"R2_score", "latency_ms", "mean_trees"} <= res.keys()
+    assert results["fast_tol_0.05"]["mean_trees"] <= results["full"]["mean_trees"]
+
+def test_save(benchmark, tmp_path):
+    """Проверяем сохранение результатов бенчмарка"""
+    # Индекс во временном каталоге, чтобы не засорять experiments/index.db
+    tracker = ExperimentTracker(str(tmp_path / "index.db"))
+    with patch("benchmark.ExperimentTracker", return_value=tracker):
+        exp_dir = benchmark.save({"full": {"R2_score": 1.0}})
+    assert os.path.isfile(os.path.join(exp_dir, "metrics.yaml")), "metrics.yaml не создан"
+    assert tracker.get_run(os.path.basename(exp_dir))["metrics"] == {"full.R2_score": 1.0}
+    os.remove(os.path.join(exp_dir, "metrics.yaml"))
+    os.rmdir(exp_dir)
@@ -0,0 +1,70 @@
+import pytest
+import json
+import os
+import numpy as np
+import pandas as pd
+import sys
+
+sys.path.insert(1, os.path.join(os.getcwd(), "src"))
+
+from monitoring import CountMinSketch, DriftMonitor, Reservoir, build_reference_profile, psi
+
+@pytest.fixture
+def X_train():
+    """Обучающая выборка для эталонного профиля"""
+    return pd.read_csv(os.path.join("data", "Train_Car_X.csv"), index_col=0)
+
+def test_psi():
+    """PSI равен нулю для одинаковых распределений и растёт при сдвиге"""
+    assert psi([0.5, 0.5], [10, 10]) == pytest.approx(0.0)
+    assert psi([0.5, 0.5], [19, 1]) > 0.2
+
+def test_count_min_sketch():
+    """Оценка частоты не меньше истинной и точна при малом числе ключей"""
+    sketch = CountMinSketch(width=64, depth=3)
+    for key, count in {"BMW": 5, "Audi": 3, "Ford": 1}.items():
+        sketch.add(key, count)
+    assert sketch.estimate("BMW") >= 5 and sketch.estimate("Ford") >= 1
+    assert sketch.table.shape == (3, 64), "Память не должна расти"
+
+def test_reservoir():
+    """Резервуар хранит не больше size значений из потока"""
+    reservoir = Reservoir(size=10)
+    for value in range(1000):
+        reservoir.add(value)
+    assert len(reservoir.values) == 10 and reservoir.seen == 1000
+    assert max(reservoir.values) >= 10, "Выборка должна обновляться по мере потока"
+
+def test_build_reference_profile(X_train):
+    """Профиль содержит корзины, выборку и частоты категорий"""
+    profile = build_reference_profile(X_train, bins=5, sample_size=100)
+    mileage = profile["numeric"]["Mileage"]
+    assert len(mileage["proportions"]) == len(mileage["edges"]) + 1
+    assert sum(mileage["proportions"]) == pytest.approx(1.0)
+    assert len(mileage["sample"]) == 100
+    assert sum(profile["categorical"]["Brand"]["proportions"].values()) == pytest.approx(1.0)
+    json.dumps(profile)  # Профиль должен сериализоваться в JSON
+
+def test_drift_monitor(X_train):
+    """Поток из обучающих данных не дрейфует, сдвинутый поток дрейфует"""
+    profile = build_reference_profile(X_train)
+    assert DriftMonitor(profile).report() == {"n_observations": 0, "features": {}}
+
+    stable = DriftMonitor(profile)
+    for row in X_train.sample(500, random_state=0).to_dict("records"):
+        stable.update(row)
+    report = stable.report()
+    assert report["n_observations"] == 500
+    assert report["features"]["Mileage"]["psi"] < 0.1
+    assert report["features"]["Brand"]["psi"] < 0.1
+
+    drifted = DriftMonitor(profile)
+    for row in X_train.sample(500, random_state=0).to_dict("records"):
+        row["Mileage"] = row["Mileage"] * 3
+        row["Brand"] = "Lada"
+        drifted.update(row)
+    report = drifted.report()
+    assert report["features"]["Mileage"]["psi"] > 0.2
+    assert report["features"]["Mileage"]["ks_pvalue"] < 0.01
+    assert report["features"]["Brand"]["unseen_share"] == pytest.approx(1.0)
+    assert np.isfinite(report["features"]["Brand"]["psi"])
@@ -1,12 +1,16 @@
 import pytest
 import os
+import json
+import numpy as np
 import pandas as pd
 from unittest.mock import patch
 import sys
+import warnings
 
 sys.path.insert(1, os.path.join(os.getcwd(), "src"))
 
 from predict import PipelinePredictor
+from tracker import ExperimentTracker
 
 @pytest.fixture
 def predictor():
@@ -25,9 +29,60 @@ def test_predict(predictor):
     
     assert isinstance(prediction[0], float), "Выход предсказания должен быть float"
 
-def test_test(predictor):
+def test_test(predictor, tmp_path):
     """Тестируем test(): должен выполняться без ошибок"""
     with patch("sys.argv", ["predict.py", "--test", "smoke"]):
         assert predictor.test() == True, "Smoke test не прошёл"
+    # Функциональный тест пишет прогон в отдельный индекс, а не в experiments/index.db
+    predictor = PipelinePredictor(index_path=str(tmp_path / "index.db"))
     with patch("sys.argv", ["predict.py", "--test", "func"]):
-        assert predictor.test() == True, "Smoke test не прошёл"
\ No newline at end of file
+        assert predictor.test() == True, "Smoke test не прошёл"
+    assert len(ExperimentTracker(str(tmp_path / "index.db")).list_runs(kind="func")) == 1
+
+def test_test_profile(predictor, tmp_path):
+    """Тестируем test() с --profile: профиль сохраняется в experiments"""
+    with patch("sys.argv", ["predict.py", "--test", "smoke", "--profile"]), \
+         patch("profiler.Profiler._save", return_value=str(tmp_path)) as save:
+        assert predictor.test() == True, "Smoke test с профилированием не прошёл"
+    target, _, _, metrics = save.call_args.args
+    assert target == "predict_smoke" and metrics["n_samples"] == 1
+
+def test_predict_fast(predictor):
+    """Тестируем predict_fast(): предсказание, разброс и число деревьев"""
+    dummy_input = pd.DataFrame({
+        "Doors": [4, 2], "Year": [2019, 2005], "Owner_Count": [1, 3],
+        "Brand": ["BMW", "Honda"], "Model": ["X5", "Accord"], "Fuel_Type": ["Diesel", "Petrol"],
+        "Transmission": ["Automatic", "Manual"], "Engine_Size": [3.0, 1.8], "Mileage": [45000, 180000]
+    })
+    
+    predictions, std_errors, n_trees = predictor.predict_fast(dummy_input, max_trees=20)
+    
+    assert predictions.shape == std_errors.shape == n_trees.shape == (2,)
+    assert ((n_trees >= 1) & (n_trees <= 20)).all(), "Превышен бюджет деревьев"
+    assert (std_errors >= 0).all(), "Стандартная ошибка должна быть неотрицательной"
+    
+    # С нулевым допуском используются все деревья бюджета и результат совпадает с лесом
+    model = predictor.pipeline.named_steps["model"]
+    n_all = len(model.estimators_)
+    predictions, _, n_trees = predictor.predict_fast(dummy_input, tolerance=0.0, max_trees=n_all)
+    assert (n_trees == n_all).all()
+    assert np.allclose(predictions, predictor.predict(dummy_input)), "Полный обход должен совпадать с predict()"
+    
+    # min_trees < 2 не должен приводить к делению на ноль
+    predictor.fast_min_trees = 1
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        _, _, n_trees = predictor.predict_fast(dummy_input, tolerance=1.0, max_trees=20)
+    assert (n_trees == 2).all(), "Остановка возможна не раньше второго дерева"
+
+def test_load_test_cases(predictor, tmp_path):
+    """Тестируем load_test_cases(): параллельная загрузка JSON"""
+    case = {"X": {"Doors": 4, "Brand": "BMW"}, "y": {"prediction": 10000}}
+    for i in range(3):
+        (tmp_path / f"test_{i}.json").write_text(json.dumps(case))
+    (tmp_path / "readme.txt").write_text("not a test case")
+    
+    X, y, test_files = predictor.load_test_cases(str(tmp_path), max_workers=2)
+    
+    assert test_files == ["test_0.json", "test_1.json", "test_2.json"]
+    assert X.shape == (3, 2) and list(y) == [10000] * 3
\ No newline at end of file
@@ -0,0 +1,105 @@
+import pytest
+import os
+import sys
+import tracemalloc
+import yaml
+
+sys.path.insert(1, os.path.join(os.getcwd(), "src"))
+
+from profiler import Profiler
+from tracker import ExperimentTracker
+
+@pytest.fixture
+def profiler(tmp_path):
+    """Создаёт профилировщик с отдельными каталогом вывода и индексом"""
+    return Profiler(output_dir=str(tmp_path / "experiments"), index_path=str(tmp_path / "index.db"))
+
+def work(n):
+    """Нагрузка с вычислениями и аллокациями"""
+    return sum(len(str(i) * 10) for i in range(n))
+
+RETAINED = [] # Удерживаемые данные, чтобы аллокации попали в прирост памяти
+
+def retain(n):
+    """Нагрузка, оставляющая аллокации после вызова"""
+    RETAINED.append([str(i) * 10 for i in range(n)])
+
+def check_allocations(exp_dir):
+    """В allocations.txt видны аллокации профилируемого кода, а не профилировщика"""
+    with open(os.path.join(exp_dir, "allocations.txt")) as f:
+        allocations = f.read()
+    assert "test_profiler.py" in allocations, "Аллокации профилируемой функции должны попасть в отчёт"
+    for own in ["pstats.py", "cProfile.py", os.sep + "profiler.py:"]:
+        assert own not in allocations, f"Аллокации профилировщика ({own}) должны быть отфильтрованы"
+
+def check_profile_dir(exp_dir, n_samples):
+    """Проверяет состав сохранённого профиля"""
+    for name in ["profile.prof", "profile.txt", "allocations.txt", "config.yaml", "metrics.yaml"]:
+        assert os.path.isfile(os.path.join(exp_dir, name)), f"{name} не создан"
+    with open(os.path.join(exp_dir, "metrics.yaml")) as f:
+        metrics = yaml.safe_load(f)
+    assert metrics["n_samples"] == n_samples
+    with open(os.path.join(exp_dir, "profile.txt")) as f:
+        assert "work" in f.read(), "Профилируемая функция должна попасть в отчёт"
+
+def test_profile_call(profiler, tmp_path):
+    """Проверяем профилирование одного вызова"""
+    assert profiler.profile_call("train", work, 1000) == work(1000)
+    exp_dirs = os.listdir(profiler.output_dir)
+    assert len(exp_dirs) == 1
+    check_profile_dir(os.path.join(profiler.output_dir, exp_dirs[0]), 1)
+    assert ExperimentTracker(profiler.index_path).get_run(exp_dirs[0])["kind"] == "profile"
+
+def test_request_window(profiler):
+    """Профилируются ровно N запросов, затем профилировщик выключается"""
+    assert not profiler.active
+    assert profiler.run(work, 10) == work(10)
+    assert profiler.status()["collected"] == 0, "Выключенный профилировщик ничего не собирает"
+
+    profiler.arm(3)
+    for _ in range(3):
+        assert profiler.active
+        profiler.run(work, 1000)
+
+    status = profiler.status()
+    assert not status["active"] and status["collected"] == 3
+    check_profile_dir(status["last_profile"], 3)
+
+
+def test_rearm_stops_tracing(profiler):
+    """Повторное включение не оставляет tracemalloc запущенным после окна"""
+    assert not tracemalloc.is_tracing()
+    profiler.arm(5)
+    profiler.arm(2)
+    for _ in range(2):
+        profiler.run(work, 100)
+
+    assert not profiler.active
+    assert not tracemalloc.is_tracing(), "tracemalloc должен быть остановлен после окна"
+
+
+def test_profiles_do_not_collide(profiler):
+    """Профили, сохранённые подряд, попадают в разные каталоги"""
+    profiler.profile_call("train", work, 10)
+    profiler.profile_call("predict_smoke", work, 10)
+    exp_dirs = sorted(os.listdir(profiler.output_dir))
+    assert len(exp_dirs) == 2
+    targets = set()
+    for exp_dir in exp_dirs:
+        with open(os.path.join(profiler.output_dir, exp_dir, "config.yaml")) as f:
+            targets.add(yaml.safe_load(f)["target"])
+    assert targets == {"train", "predict_smoke"}
+    run = ExperimentTracker(profiler.index_path).get_run(exp_dirs[0])
+    assert "." in run["created_at"], "Время прогона должно разбираться из имени каталога с микросекундами"
+
+
+def test_allocations(profiler):
+    """Отчёт об аллокациях показывает профилируемый код в обоих режимах"""
+    profiler.profile_call("train", retain, 10000)
+    check_allocations(os.path.join(profiler.output_dir, os.listdir(profiler.output_dir)[0]))
+
+    profiler.arm(3)
+    for _ in range(3):
+        profiler.run(retain, 10000)
+    check_allocations(profiler.status()["last_profile"])
+    RETAINED.clear()
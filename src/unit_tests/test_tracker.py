@@ -0,0 +1,121 @@
+import pytest
+import os
+import sqlite3
+import sys
+import yaml
+
+sys.path.insert(1, os.path.join(os.getcwd(), "src"))
+
+from tracker import SCHEMA, ExperimentTracker, flatten, file_digest
+
+@pytest.fixture
+def tracker(tmp_path):
+    """Создаёт трекер с отдельным индексом перед каждым тестом"""
+    return ExperimentTracker(str(tmp_path / "index.db"))
+
+def make_experiment(root, name, r2, max_depth):
+    """Создаёт каталог эксперимента в формате predict.py"""
+    exp_dir = root / name
+    exp_dir.mkdir()
+    with open(exp_dir / "config.yaml", "w") as f:
+        yaml.safe_dump({"model_params": {"max_depth": max_depth, "criterion": "poisson"},
+                        "model_path": "experiments/rand_forest_pipeline.pkl"}, f)
+    with open(exp_dir / "metrics.yaml", "w") as f:
+        yaml.safe_dump({"R2_score": r2, "timings": {"load_s": 0.1}}, f)
+    return exp_dir
+
+def test_flatten():
+    """Проверяем разворачивание вложенных словарей"""
+    assert flatten({"a": 1, "b": {"c": 2, "d": {"e": 3}}}) == {"a": 1, "b.c": 2, "b.d.e": 3}
+
+def test_file_digest(tmp_path):
+    """Проверяем хэш и размер артефакта"""
+    path = tmp_path / "model.pkl"
+    path.write_bytes(b"model")
+    digest, size = file_digest(str(path))
+    assert len(digest) == 64 and size == 5
+    assert file_digest(str(tmp_path / "missing.pkl")) == (None, None)
+
+def test_log_run(tracker, tmp_path):
+    """Проверяем запись и чтение прогона"""
+    model_path = tmp_path / "model.pkl"
+    model_path.write_bytes(b"model")
+    tracker.log_run("train_1", "train", params={"max_depth": 18}, metrics={"R2_score": 0.95},
+                    timings={"fit_s": 1.5}, model_path=str(model_path))
+
+    run = tracker.get_run("train_1")
+    assert run["kind"] == "train" and run["model_size"] == 5
+    assert run["params"] == {"max_depth": "18"}
+    assert run["metrics"] == {"R2_score": 0.95, "timings.fit_s": 1.5}
+
+    with pytest.raises(KeyError):
+        tracker.get_run("missing")
+
+def test_rebuild_list_and_diff(tracker, tmp_path):
+    """Проверяем перестроение индекса, фильтрацию, сортировку и сравнение"""
+    root = tmp_path / "experiments"
+    root.mkdir()
+    make_experiment(root, "experiment_2025_01_01_00_00_00", 0.90, 9)
+    make_experiment(root, "experiment_2025_01_02_00_00_00", 0.95, 18)
+    tracker.log_run("train_1", "train", metrics={"R2_score": 0.97})
+
+    assert tracker.rebuild(str(root)) == 2
+    assert tracker.rebuild(str(root)) == 2, "Повторное перестроение не должно дублировать прогоны"
+
+    runs = tracker.list_runs()
+    assert len(runs) == 3, "Прогоны обучения должны сохраняться при перестроении"
+
+    runs = tracker.list_runs(kind="func", sort="R2_score", descending=True)
+    assert list(runs["run_id"]) == ["experiment_2025_01_02_00_00_00", "experiment_2025_01_01_00_00_00"]
+    assert list(runs["R2_score"]) == [0.95, 0.90]
+
+    runs = tracker.list_runs(filters=["max_depth>12"])
+    assert list(runs["run_id"]) == ["experiment_2025_01_02_00_00_00"]
+    runs = tracker.list_runs(filters=["R2_score>=0.93", "criterion=poisson"], limit=5)
+    assert list(runs["run_id"]) == ["experiment_2025_01_02_00_00_00"]
+    with pytest.raises(ValueError):
+        tracker.list_runs(filters=["R2_score ~ 1"])
+
+    # Сортировка по параметру, а не только по метрике
+    runs = tracker.list_runs(kind="func", sort="max_depth", descending=True)
+    assert list(runs["run_id"]) == ["experiment_2025_01_02_00_00_00", "experiment_2025_01_01_00_00_00"]
+    runs = tracker.list_runs(kind="func", sort="max_depth")
+    assert list(runs["run_id"]) == ["experiment_2025_01_01_00_00_00", "experiment_2025_01_02_00_00_00"]
+    with pytest.raises(ValueError):
+        tracker.list_runs(sort="unknown_field")
+    runs = tracker.list_runs(kind="func", sort="source_dir", descending=True)
+    assert list(runs["run_id"]) == ["experiment_2025_01_02_00_00_00", "experiment_2025_01_01_00_00_00"]
+
+    # Пустой результат содержит те же колонки, что и непустой
+    runs = tracker.list_runs(filters=["R2_score>1"], columns=["R2_score", "timings.load_s"])
+    assert runs.empty and {"run_id", "R2_score", "timings.load_s"} <= set(runs.columns)
+
+    diff = tracker.diff("experiment_2025_01_01_00_00_00", "experiment_2025_01_02_00_00_00")
+    assert {"params.max_depth", "metrics.R2_score", "created_at", "source_dir"} <= set(diff.index)
+    assert "params.criterion" not in diff.index
+
+def test_string_params_are_not_numbers(tracker, tmp_path):
+    """Текстовые параметры не участвуют в числовых фильтрах и сортировке как 0"""
+    tracker.log_run("run_sqrt", "train", params={"max_features": "sqrt"})
+    tracker.log_run("run_half", "train", params={"max_features": 0.5})
+    tracker.log_run("run_one", "train", params={"max_features": 1.0})
+
+    assert list(tracker.list_runs(filters=["max_features<0.3"])["run_id"]) == []
+    assert list(tracker.list_runs(filters=["max_features<0.7"])["run_id"]) == ["run_half"]
+    assert list(tracker.list_runs(filters=["max_features=sqrt"])["run_id"]) == ["run_sqrt"]
+    assert list(tracker.list_runs(sort="max_features")["run_id"]) == ["run_half", "run_one", "run_sqrt"]
+    assert list(tracker.list_runs(sort="max_features", descending=True)["run_id"]) == ["run_one", "run_half", "run_sqrt"]
+
+def test_migrate_old_index(tmp_path):
+    """Индекс без params.value_num дополняется колонкой при открытии"""
+    index_path = str(tmp_path / "old.db")
+    with sqlite3.connect(index_path) as conn:
+        conn.executescript(SCHEMA.replace("    value_num REAL,\n", ""))
+        conn.execute("INSERT INTO runs (run_id, kind, created_at) VALUES ('old', 'train', '2025')")
+        conn.execute("INSERT INTO params VALUES ('old', 'max_depth', '18')")
+        conn.execute("INSERT INTO params VALUES ('old', 'criterion', 'poisson')")
+    conn.close()
+
+    tracker = ExperimentTracker(index_path)
+    assert list(tracker.list_runs(filters=["max_depth>12"])["run_id"]) == ["old"]
+    assert list(tracker.list_runs(filters=["criterion<1"])["run_id"]) == []
@@ -6,6 +6,7 @@ import sys
 sys.path.insert(1, os.path.join(os.getcwd(), "src"))
 
 from train import ForestPipelineModel
+from tracker import ExperimentTracker
 
 @pytest.fixture
 def model():
@@ -19,12 +20,15 @@ def test_create_pipeline(model):
     pipeline = model.create_pipeline(use_config=True)
     assert isinstance(pipeline, Pipeline), "Пайплайн не создан"
 
-def test_train_and_evaluate(model):
+def test_train_and_evaluate(tmp_path):
     """Проверяем обучение и сохранение пайплайна"""
+    model = ForestPipelineModel(index_path=str(tmp_path / "index.db"))
     pipeline = model.create_pipeline(use_config=False)
 
     model.train_and_evaluate(pipeline, predict=True)
     assert os.path.isfile(model.pipeline_path), "Файл пайплайна не был создан"
+    assert len(ExperimentTracker(str(tmp_path / "index.db")).list_runs(kind="train")) == 1, \
+        "Прогон обучения не записан в индекс"
         
 def test_save_pipeline(model):
     """Проверяем, что пайплайн сохраняется корректно"""
@@ -1,6 +1,7 @@
 import os
 import sys
 import pytest
+import pandas as pd
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, patch
 
@@ -11,7 +12,10 @@ sys.path.insert(1, os.path.join(os.getcwd(), "src"))
 with patch("database.MongoDBConnector.get_database", return_value=MagicMock(
     predictions=MagicMock(insert_one=lambda x: type("Obj", (object,), {"inserted_id": "12345"})())
 )):
-    from api import app  # Импортируем после патчинга
+    from api import api, app  # Импортируем после патчинга
+
+from monitoring import DriftMonitor, build_reference_profile
+from profiler import Profiler
 
 client = TestClient(app)
 
@@ -35,4 +39,62 @@ def test_predict():
     response = client.post("/predict", json=payload)
     assert response.status_code == 200
     data = response.json()
-    assert "prediction" in data
\ No newline at end of file
+    assert "prediction" in data
+
+def test_predict_fast_mode():
+    payload = {
+        "Doors": 4,
+        "Year": 2020,
+        "Owner_Count": 1,
+        "Brand": "Toyota",
+        "Model": "Corolla",
+        "Fuel_Type": "Petrol",
+        "Transmission": "Manual",
+        "Engine_Size": 1.8,
+        "Mileage": 15000
+    }
+    response = client.post("/predict?mode=fast", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert {"prediction", "std_error", "n_trees"} <= data.keys()
+
+    response = client.post("/predict?mode=unknown", json=payload)
+    assert response.status_code == 422
+
+
+def test_monitoring(monkeypatch):
+    # Монитор подменяется только на время теста
+    monkeypatch.setattr(api, "monitor", None)
+    assert client.get("/monitoring").json() == {"status": "disabled"}
+
+    X_train = pd.read_csv(os.path.join("data", "Train_Car_X.csv"), index_col=0)
+    monkeypatch.setattr(api, "monitor", DriftMonitor(build_reference_profile(X_train)))
+    payload = X_train.iloc[0].to_dict()
+    assert client.post("/predict", json=payload).status_code == 200
+
+    data = client.get("/monitoring").json()
+    assert data["status"] == "ok"
+    assert data["n_observations"] == 1
+    assert {"Mileage", "Engine_Size", "Year", "Brand", "Model"} <= data["features"].keys()
+
+
+def test_admin_profile(tmp_path, monkeypatch):
+    # Профиль и индекс во временном каталоге, чтобы не засорять experiments
+    monkeypatch.setattr(api, "profiler", Profiler(output_dir=str(tmp_path), index_path=str(tmp_path / "index.db")))
+    api._register_admin_routes()
+    assert client.get("/admin/profile").json()["active"] is False
+
+    assert client.post("/admin/profile?requests=0").status_code == 422
+    status = client.post("/admin/profile?requests=1").json()
+    assert status["active"] is True and status["target"] == 1
+
+    payload = {
+        "Doors": 4, "Year": 2020, "Owner_Count": 1, "Brand": "Toyota", "Model": "Corolla",
+        "Fuel_Type": "Petrol", "Transmission": "Manual", "Engine_Size": 1.8, "Mileage": 15000
+    }
+    assert client.post("/predict", json=payload).status_code == 200
+
+    status = client.get("/admin/profile").json()
+    assert status["active"] is False and status["collected"] == 1
+    assert os.path.isfile(os.path.join(status["last_profile"], "profile.prof"))
+    assert os.path.dirname(status["last_profile"]) == str(tmp_path)
@@ -2,14 +2,19 @@ import os
 import sys
 import json
 import time
+import yaml
+from datetime import datetime
 import requests
 import configparser
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from pymongo import MongoClient
 from sklearn.metrics import r2_score
 
 sys.path.insert(1, os.path.join(os.getcwd(), "src"))
 
 from logger import Logger
+from tracker import ExperimentTracker
 
 logger = Logger(True).get_logger(__name__)
 
@@ -32,6 +37,38 @@ SERVER_URL = "http://localhost:8000/predict"
 # Путь до папки с тестовыми JSON-файлами
 TESTS_DIR = os.path.join(os.path.dirname(__file__), "test_data")
 
+# Ограничение числа одновременных запросов к API
+MAX_WORKERS = int(os.environ.get("FUNC_TEST_WORKERS", 8))
+
+def load_test_case(test_file):
+    """Чтение одного тестового JSON"""
+    with open(test_file, "r") as f:
+        return json.load(f)
+
+def case_key(input_data):
+    """Ключ для сопоставления входа теста и записи в базе.
+
+    API сохраняет числа после валидации pydantic (Mileage: 130322 -> 130322.0),
+    поэтому числа приводятся к float с обеих сторон.
+    """
+    normalized = {k: float(v) if isinstance(v, (int, float)) else v for k, v in input_data.items()}
+    return json.dumps(normalized, sort_keys=True)
+
+def save_run(r2, test_files, timings):
+    """Сохранение R² и замеров времени в experiments/api_<timestamp> и в индекс экспериментов"""
+    exp_dir = os.path.join(os.getcwd(), "experiments", f"api_{datetime.now().strftime('%Y_%m_%d_%H_%M_%S')}")
+    os.makedirs(exp_dir, exist_ok=True)
+
+    with open(os.path.join(exp_dir, "config.yaml"), "w") as cfg_f:
+        yaml.safe_dump({"server_url": SERVER_URL, "max_workers": MAX_WORKERS,
+                        "test_data_paths": test_files}, cfg_f, sort_keys=False)
+    with open(os.path.join(exp_dir, "metrics.yaml"), "w") as metrics_f:
+        yaml.safe_dump({"R2_score": float(r2), "n_test_cases": len(test_files), "timings": timings},
+                       metrics_f, sort_keys=False)
+
+    ExperimentTracker().log_dir(exp_dir)
+    return exp_dir
+
 def test_func_api_r2():
     """
     Функциональный тест API:
@@ -40,36 +77,50 @@ def test_func_api_r2():
     - Вычисляем R² между предсказаниями из базы и истинными значениями.
     - Тест проходит, если R² >= 0.8.
     """
-    test_files = [os.path.join(TESTS_DIR, f) for f in os.listdir(TESTS_DIR) if f.endswith(".json")]
+    test_files = [os.path.join(TESTS_DIR, f) for f in sorted(os.listdir(TESTS_DIR)) if f.endswith(".json")]
+    timings = {}
+    
+    # Параллельно читаем тестовые JSON
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        cases = list(executor.map(load_test_case, test_files))
+    inputs = [case["X"] for case in cases]
+    expected_values = [case["y"]["prediction"] for case in cases]
+    timings["load_s"] = time.perf_counter() - start
     
-    expected_values = []
-    # Отправляем запросы к API
-    for test_file in test_files:
-        with open(test_file, "r") as f:
-            data = json.load(f)
-        input_data = data["X"]
-        expected = data["y"]["prediction"]
-        expected_values.append(expected)
-        
-        response = requests.post(SERVER_URL, json=input_data)
-        assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
-        # Короткая задержка, чтобы запись успела произойти в базе
-        time.sleep(0.5)
+    # Отправляем запросы к API через общий пул соединений.
+    # API сохраняет запись в базу до ответа, поэтому задержки не нужны
+    start = time.perf_counter()
+    with requests.Session() as session:
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_WORKERS))
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            status_codes = list(executor.map(
+                lambda input_data: session.post(SERVER_URL, json=input_data).status_code, inputs))
+    for status_code in status_codes:
+        assert status_code == 200, f"Unexpected status code: {status_code}"
+    timings["requests_s"] = time.perf_counter() - start
     
-    # Подключаемся к базе данных и собираем предсказания
+    # Подключаемся к базе данных и собираем предсказания одним запросом
+    start = time.perf_counter()
     client = MongoClient(MONGO_URL)
     db = client[DB_NAME]
-    db_predictions = []
+    records = db.predictions.find(
+        {"input": {"$in": inputs}, "mode": {"$ne": "fast"}},
+        {"_id": 0, "input": 1, "prediction": 1}
+    )
+    found = {case_key(record["input"]): record.get("prediction") for record in records}
+    client.close()
+    timings["db_verify_s"] = time.perf_counter() - start
     
-    for test_file in test_files:
-        with open(test_file, "r") as f:
-            data = json.load(f)
-        input_data = data["X"]
-        record = db.predictions.find_one({"input": input_data})
-        assert record is not None, f"Record for input {input_data} not found in database"
-        db_predictions.append(record.get("prediction"))
+    db_predictions = []
+    for input_data in inputs:
+        key = case_key(input_data)
+        assert key in found, f"Record for input {input_data} not found in database"
+        db_predictions.append(found[key])
     
     # Вычисляем R^2-метрику
     r2 = r2_score(expected_values, db_predictions)
     assert r2 >= 0.8, f"R^2 Score {r2:.4f} is below acceptable threshold"
-    logger.info(f"Functional test was successful! R^2 Score: {r2:.4f}")
\ No newline at end of file
+    logger.info(f"Functional test was successful! R^2 Score: {r2:.4f}")
+    logger.info("Timings: " + ", ".join(f"{phase} {sec:.3f}" for phase, sec in timings.items()))
+    logger.info(f"Results saved to {save_run(r2, test_files, timings)}")
\ No newline at end of file